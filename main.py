@@ -1,4 +1,5 @@
 import streamlit as st
+import functools
 from datetime import date, timedelta
 import numpy as np
 import pandas as pd
@@ -25,25 +26,25 @@ MAX_START_STOCKS = 80  # Maximum stocks allocation at start
 MAX_START_BONDS = 70   # Maximum bonds allocation at start
 MIN_START_CASH = 5     # Minimum cash allocation at start
 
-def calculate_start_allocation(time_horizon: int) -> dict:
+# Allocation ranges covered as time_factor goes from 0 to 1, folded once at import
+START_STOCKS_RANGE = MAX_START_STOCKS - END_ALLOCATION['stocks']
+START_BONDS_RANGE = (MAX_START_BONDS - END_ALLOCATION['bonds']) * 0.7
+
+@functools.lru_cache(maxsize=64)
+def calculate_start_allocation(time_horizon: int) -> tuple:
     """
     Calculate starting allocation based on time horizon and end allocation.
     Uses a more conservative approach suitable for education savings.
+    Returns a (stocks, bonds, cash) tuple of percentages.
     """
     # Calculate years remaining factor (0 to 1)
     time_factor = min(time_horizon / 10, 1)  # Cap at 10 years for max aggressiveness
     
-    # Calculate starting stocks allocation
-    start_stocks = min(
-        END_ALLOCATION['stocks'] + (MAX_START_STOCKS - END_ALLOCATION['stocks']) * time_factor,
-        MAX_START_STOCKS
-    )
+    # Calculate starting stocks allocation (time_factor <= 1 keeps this within MAX_START_STOCKS)
+    start_stocks = END_ALLOCATION['stocks'] + START_STOCKS_RANGE * time_factor
     
-    # Calculate starting bonds allocation
-    start_bonds = min(
-        END_ALLOCATION['bonds'] + (MAX_START_BONDS - END_ALLOCATION['bonds']) * time_factor * 0.7,
-        MAX_START_BONDS
-    )
+    # Calculate starting bonds allocation (time_factor <= 1 keeps this within MAX_START_BONDS)
+    start_bonds = END_ALLOCATION['bonds'] + START_BONDS_RANGE * time_factor
     
     # Ensure minimum cash allocation
     start_cash = max(MIN_START_CASH, 100 - start_stocks - start_bonds)
@@ -51,94 +52,70 @@ def calculate_start_allocation(time_horizon: int) -> dict:
     # Adjust bonds to make total 100%
     start_bonds = 100 - start_stocks - start_cash
     
-    return {
-        'stocks': round(start_stocks, 2),
-        'bonds': round(start_bonds, 2),
-        'cash': round(start_cash, 2)
-    }
+    return round(start_stocks, 2), round(start_bonds, 2), round(start_cash, 2)
 
-def generate_glide_path(time_horizon: int) -> list:
-    """Generate a glide path for portfolio allocation."""
-    start_allocation = calculate_start_allocation(time_horizon)
-    glide_path = []
+@functools.lru_cache(maxsize=64)
+def generate_glide_path(time_horizon: int) -> tuple:
+    """
+    Generate a glide path for portfolio allocation.
+    Returns read-only (stocks, bonds, cash) arrays indexed by year.
+    """
+    start_stocks, start_bonds, start_cash = calculate_start_allocation(time_horizon)
+    n = time_horizon + 1
     
-    for year in range(time_horizon + 1):
-        stocks = start_allocation['stocks'] + (END_ALLOCATION['stocks'] - start_allocation['stocks']) * year / time_horizon
-        bonds = start_allocation['bonds'] + (END_ALLOCATION['bonds'] - start_allocation['bonds']) * year / time_horizon
-        cash = start_allocation['cash'] + (END_ALLOCATION['cash'] - start_allocation['cash']) * year / time_horizon
-        
-        glide_path.append({
-            'year': year,
-            'stocks': round(stocks, 2),
-            'bonds': round(bonds, 2),
-            'cash': round(cash, 2)
-        })
-    return glide_path
+    stocks = np.linspace(start_stocks, END_ALLOCATION['stocks'], n)
+    bonds = np.linspace(start_bonds, END_ALLOCATION['bonds'], n)
+    cash = np.linspace(start_cash, END_ALLOCATION['cash'], n)
+    
+    # The cached arrays are shared across reruns, so callers must not mutate them
+    for allocation in (stocks, bonds, cash):
+        allocation.flags.writeable = False
+    
+    return stocks, bonds, cash
 
-def calculate_required_deposit(goal: float, years: int, start_allocation: dict) -> float:
+def calculate_growth_factors(glide_path: tuple) -> np.ndarray:
+    """Calculate the portfolio growth multiplier for each year of the glide path."""
+    stocks, bonds, cash = glide_path
+    return (
+        stocks * (1 + STOCKS_RETURN)
+        + bonds * (1 + BONDS_RETURN)
+        + cash * (1 + CASH_RETURN)
+    ) / 100
+
+@st.cache_data(max_entries=128)
+def calculate_required_deposit(goal: float, years: int, growth: np.ndarray) -> float:
     """Calculate required annual deposit based on goal and returns."""
     if years <= 0:
         return goal
     
-    guess = goal / years
-    
-    def calculate_final_value(deposit: float) -> float:
-        value = 0
-        for _ in range(years):
-            value += deposit
-            stocks = value * (start_allocation['stocks'] / 100) * (1 + STOCKS_RETURN)
-            bonds = value * (start_allocation['bonds'] / 100) * (1 + BONDS_RETURN)
-            cash = value * (start_allocation['cash'] / 100) * (1 + CASH_RETURN)
-            value = stocks + bonds + cash
-        return value
-    
-    low, high = 0, goal * 2
-    for _ in range(20):  # Binary search for optimal deposit
-        guess = (low + high) / 2
-        final_value = calculate_final_value(guess)
-        if abs(final_value - goal) < 0.01:
-            break
-        if final_value < goal:
-            low = guess
-        else:
-            high = guess
-    return guess
+    # Each deposit grows by every year's factor from when it is made until the end,
+    # so the final value is deposit * sum of the reversed cumulative products of growth
+    return goal / np.sum(np.cumprod(growth[years - 1::-1]))
 
-def calculate_portfolio_projections(annual_deposit: float, time_horizon: int, glide_path: list) -> list:
+@st.cache_data(max_entries=128)
+def calculate_portfolio_projections(annual_deposit: float, time_horizon: int, glide_path: tuple, growth: np.ndarray) -> pd.DataFrame:
     """Calculate year-by-year portfolio projections."""
-    projections = []
-    portfolio_value = 0
+    # Allocation and growth in effect during each year of saving
+    stocks, bonds, cash = (allocation[:time_horizon] / 100 for allocation in glide_path)
+    growth = growth[:time_horizon]
     
-    for year in range(1, time_horizon + 1):
-        # Add annual deposit
-        portfolio_value += annual_deposit
-        
-        # Get current year's allocation
-        allocation = glide_path[year - 1]
-        
-        # Calculate individual asset values
-        stocks_value = portfolio_value * (allocation['stocks'] / 100)
-        bonds_value = portfolio_value * (allocation['bonds'] / 100)
-        cash_value = portfolio_value * (allocation['cash'] / 100)
-        
-        # Apply returns
-        stocks_after_return = stocks_value * (1 + STOCKS_RETURN)
-        bonds_after_return = bonds_value * (1 + BONDS_RETURN)
-        cash_after_return = cash_value * (1 + CASH_RETURN)
-        
-        # Update portfolio value
-        portfolio_value = stocks_after_return + bonds_after_return + cash_after_return
-        
-        projections.append({
-            'year': year,
-            'deposit': annual_deposit,
-            'portfolio_value': portfolio_value,
-            'stocks_value': stocks_after_return,
-            'bonds_value': bonds_after_return,
-            'cash_value': cash_after_return
-        })
+    # Unroll value_k = (value_{k-1} + deposit) * growth_k:
+    # value_k = deposit * P_k * sum_{j<=k} 1 / P_{j-1}, where P is the cumulative product of growth
+    cumulative_growth = np.cumprod(growth)
+    prior_growth = np.concatenate(([1.0], cumulative_growth[:-1]))
+    portfolio_value = annual_deposit * cumulative_growth * np.cumsum(1 / prior_growth)
     
-    return projections
+    # Value invested at the start of each year (previous value plus the deposit)
+    invested = np.concatenate(([0.0], portfolio_value[:-1])) + annual_deposit
+    
+    return pd.DataFrame({
+        'year': np.arange(1, time_horizon + 1),
+        'deposit': np.full(time_horizon, annual_deposit, dtype=np.float64),
+        'portfolio_value': portfolio_value,
+        'stocks_value': invested * stocks * (1 + STOCKS_RETURN),
+        'bonds_value': invested * bonds * (1 + BONDS_RETURN),
+        'cash_value': invested * cash * (1 + CASH_RETURN)
+    })
 
 def main():
     st.title("Education Savings Calculator")
@@ -204,23 +181,27 @@ def main():
         total_savings_goal = total_tuition + cushion_savings
         
         # Calculate starting allocation
-        start_allocation = calculate_start_allocation(time_horizon)
+        start_stocks, start_bonds, start_cash = calculate_start_allocation(time_horizon)
         
         # Generate glide path
         glide_path = generate_glide_path(time_horizon)
         
+        # Calculate each year's growth along the glide path
+        growth = calculate_growth_factors(glide_path)
+        
         # Calculate recommended deposit
         recommended_deposit = calculate_required_deposit(
             total_savings_goal,
             time_horizon,
-            start_allocation
+            growth
         )
         
         # Calculate projections
         projections = calculate_portfolio_projections(
             recommended_deposit,
             time_horizon,
-            glide_path
+            glide_path,
+            growth
         )
         
         # Display results
@@ -240,25 +221,30 @@ def main():
         st.write(f"Based on your {time_horizon}-year time horizon, here's your recommended starting allocation:")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Stocks", f"{start_allocation['stocks']}%")
+            st.metric("Stocks", f"{start_stocks}%")
         with col2:
-            st.metric("Bonds", f"{start_allocation['bonds']}%")
+            st.metric("Bonds", f"{start_bonds}%")
         with col3:
-            st.metric("Cash", f"{start_allocation['cash']}%")
+            st.metric("Cash", f"{start_cash}%")
         
         # Glide path visualization
         st.subheader("Investment Glide Path")
-        glide_path_df = pd.DataFrame(glide_path)
-        st.line_chart(glide_path_df[['stocks', 'bonds', 'cash']])
+        stocks, bonds, cash = glide_path
+        st.line_chart(pd.DataFrame({'stocks': stocks, 'bonds': bonds, 'cash': cash}))
         
         # Portfolio projection visualization
         st.subheader("Portfolio Value Projection")
-        projection_df = pd.DataFrame(projections)
-        st.line_chart(projection_df['portfolio_value'])
+        st.line_chart(projections['portfolio_value'])
         
         # Detailed projections table
         st.subheader("Year-by-Year Projections")
-        st.dataframe(pd.DataFrame(projections).round(2))
+        st.dataframe(projections.style.format({
+            'deposit': '${:,.2f}',
+            'portfolio_value': '${:,.2f}',
+            'stocks_value': '${:,.2f}',
+            'bonds_value': '${:,.2f}',
+            'cash_value': '${:,.2f}'
+        }))
 
 if __name__ == "__main__":
     main()